@@ -0,0 +1,109 @@
+"""
+Piezas compartidas por main.py y main_onnx.py (sin dependencias del modelo)
+"""
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+import orjson
+import hashlib
+import math
+
+# ═══════════════════════════════════════════════════════════════════════
+# JSON RÁPIDO (orjson para respuestas y para el cuerpo de los requests)
+# ═══════════════════════════════════════════════════════════════════════
+
+class ORJSONRequest(Request):
+    """Request que decodifica el cuerpo JSON con orjson en lugar de json.loads"""
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Ruta que entrega ORJSONRequest a los endpoints"""
+    def get_route_handler(self):
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request):
+            return await original_route_handler(ORJSONRequest(request.scope, request.receive))
+
+        return custom_route_handler
+
+# ═══════════════════════════════════════════════════════════════════════
+# RESPUESTAS PRECALCULADAS (bytes JSON + ETag para /, /health, /info)
+# ═══════════════════════════════════════════════════════════════════════
+
+# /info no cambia mientras el proceso vive: los proxies pueden servirlo desde caché
+INFO_CACHE_CONTROL = "public, max-age=60"
+
+def _etag(body: bytes) -> str:
+    """ETag estable derivado del contenido"""
+    return f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+def prebuilt_json(payload) -> tuple:
+    """Serializa `payload` una sola vez al iniciar: (bytes JSON, ETag)"""
+    body = orjson.dumps(payload)
+    return body, _etag(body)
+
+def cached_json(request: Request, body: bytes, etag: str, cache_control: str = None) -> Response:
+    """Devuelve bytes precalculados, o 304 si el cliente ya tiene esa versión"""
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ═══════════════════════════════════════════════════════════════════════
+# PREDICCIÓN DE UN REGISTRO (/predict y /predict-raw)
+# ═══════════════════════════════════════════════════════════════════════
+
+# Indexados por número de cluster
+CLUSTER_NAMES = (
+    "Desarrollo Alto 🟢",
+    "Desarrollo Medio-Alto 🔵",
+    "Desarrollo Medio-Bajo 🟠",
+    "Desarrollo Bajo 🔴"
+)
+
+def check_number(v):
+    """
+    Valida un valor leído sin pydantic: solo int/float finitos (rechaza bool,
+    strings, null y NaN/inf, que darían un cluster inventado)
+    """
+    if type(v) not in (int, float) or not math.isfinite(v):
+        raise ValueError(f"valor no numérico o no finito: {v!r}")
+    return v
+
+def cache_key(values) -> tuple:
+    """Clave del caché de predicciones: redondear a 4 decimales agrupa casi-duplicados"""
+    return tuple(round(check_number(v), 4) for v in values)
+
+def build_predict_one(assign_cached, response_cls, descriptions):
+    """
+    Genera el `_predict_one(key)` de una app. `assign_cached(key)` recibe una clave de
+    cache_key (en el orden de las características) y devuelve (cluster, campos extra
+    de la respuesta), p. ej. {"confidence": ...} en main.py.
+    """
+    def predict_one(key: tuple):
+        cluster, extra = assign_cached(key)
+        return response_cls(
+            cluster=cluster,
+            cluster_name=CLUSTER_NAMES[cluster],
+            description=descriptions[cluster],
+            **extra
+        )
+
+    return predict_one
+
+def cache_metrics(cached_fn) -> dict:
+    """Estadísticas de un caché lru_cache (por worker) para /metrics"""
+    info = cached_fn.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "cache_hits": info.hits,
+        "cache_misses": info.misses,
+        "cache_size": info.currsize,
+        "cache_maxsize": info.maxsize,
+        "cache_hit_rate": info.hits / lookups if lookups else 0.0
+    }
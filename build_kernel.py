@@ -0,0 +1,23 @@
+"""
+Script para compilar kernel.c como extensión Python (_kernel_c) con cffi
+Uso: python build_kernel.py  (requiere cffi y un compilador C)
+Si la extensión no está compilada, kernel.py usa Numba o numpy
+"""
+import os
+from cffi import FFI
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ffibuilder = FFI()
+ffibuilder.cdef("""
+    int has_avx2(void);
+    void assign(const float* x, const float* inv_scale, const float* bias,
+                const float* centers, int n_clusters, int* out_k, float* out_d2);
+""")
+
+with open(os.path.join(HERE, "kernel.c"), "r") as f:
+    ffibuilder.set_source("_kernel_c", f.read(), extra_compile_args=["-O3"])
+
+if __name__ == "__main__":
+    ffibuilder.compile(tmpdir=os.path.join(HERE, "build"), target=os.path.join(HERE, "_kernel_c.*"), verbose=True)
+    print("✅ Extensión _kernel_c compilada")
@@ -1,22 +1,57 @@
-
 """
 Cliente Python para consumir la API de Clustering
 """
-import requests
-import json
+import asyncio
+import httpx
 from typing import Dict, List
 
+# Conexiones keep-alive reutilizadas entre llamadas (evita handshake TCP/TLS por request)
+DEFAULT_LIMITS = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=30.0)
+DEFAULT_TIMEOUT = httpx.Timeout(5.0, read=30.0)
+
+
+def _department_payload(ymophg_mean: float, ymophg_median: float, anosest_mean: float,
+                        edad_mean: float, totper_mean: float, tasa_ocupacion: float,
+                        tasa_pobreza: float, tasa_nbi: float) -> Dict:
+    """Arma el cuerpo JSON de /predict en el orden esperado por el modelo"""
+    return {
+        "ymophg_mean": ymophg_mean,
+        "ymophg_median": ymophg_median,
+        "anosest_mean": anosest_mean,
+        "edad_mean": edad_mean,
+        "totper_mean": totper_mean,
+        "tasa_ocupacion": tasa_ocupacion,
+        "tasa_pobreza": tasa_pobreza,
+        "tasa_nbi": tasa_nbi
+    }
+
+
 class ClusteringAPIClient:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.session = httpx.Client(
+            base_url=base_url,
+            http2=True,
+            limits=DEFAULT_LIMITS,
+            timeout=DEFAULT_TIMEOUT
+        )
+
+    def close(self):
+        """Cierra las conexiones abiertas"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def health_check(self) -> bool:
         """Verifica si el servidor está disponible"""
         try:
-            response = self.session.get(f"{self.base_url}/health")
+            response = self.session.get("/health")
             return response.status_code == 200
-        except:
+        except httpx.HTTPError:
             return False
 
     def predict(self, 
@@ -31,27 +66,81 @@ class ClusteringAPIClient:
         """
         Predice el cluster para un departamento
         """
-        data = {
-            "ymophg_mean": ymophg_mean,
-            "ymophg_median": ymophg_median,
-            "anosest_mean": anosest_mean,
-            "edad_mean": edad_mean,
-            "totper_mean": totper_mean,
-            "tasa_ocupacion": tasa_ocupacion,
-            "tasa_pobreza": tasa_pobreza,
-            "tasa_nbi": tasa_nbi
-        }
-        response = self.session.post(f"{self.base_url}/predict", json=data)
+        data = _department_payload(
+            ymophg_mean, ymophg_median, anosest_mean, edad_mean,
+            totper_mean, tasa_ocupacion, tasa_pobreza, tasa_nbi
+        )
+        response = self.session.post("/predict", json=data)
         return response.json()
 
     def predict_batch(self, data_list: List[Dict]) -> Dict:
         """Predice clusters para múltiples departamentos"""
-        response = self.session.post(f"{self.base_url}/predict-batch", json=data_list)
+        response = self.session.post("/predict-batch", json=data_list)
         return response.json()
 
     def get_info(self) -> Dict:
         """Obtiene información del modelo"""
-        response = self.session.get(f"{self.base_url}/info")
+        response = self.session.get("/info")
+        return response.json()
+
+
+class AsyncClusteringAPIClient:
+    """Variante asíncrona: permite lanzar muchas predicciones concurrentes con asyncio.gather"""
+
+    def __init__(self, base_url: str = "http://localhost:8000"):
+        self.base_url = base_url
+        self.session = httpx.AsyncClient(
+            base_url=base_url,
+            http2=True,
+            limits=DEFAULT_LIMITS,
+            timeout=DEFAULT_TIMEOUT
+        )
+
+    async def aclose(self):
+        """Cierra las conexiones abiertas"""
+        await self.session.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def health_check(self) -> bool:
+        """Verifica si el servidor está disponible"""
+        try:
+            response = await self.session.get("/health")
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async def predict(self,
+                      ymophg_mean: float,
+                      ymophg_median: float,
+                      anosest_mean: float,
+                      edad_mean: float,
+                      totper_mean: float,
+                      tasa_ocupacion: float,
+                      tasa_pobreza: float,
+                      tasa_nbi: float) -> Dict:
+        """
+        Predice el cluster para un departamento
+        """
+        data = _department_payload(
+            ymophg_mean, ymophg_median, anosest_mean, edad_mean,
+            totper_mean, tasa_ocupacion, tasa_pobreza, tasa_nbi
+        )
+        response = await self.session.post("/predict", json=data)
+        return response.json()
+
+    async def predict_batch(self, data_list: List[Dict]) -> Dict:
+        """Predice clusters para múltiples departamentos"""
+        response = await self.session.post("/predict-batch", json=data_list)
+        return response.json()
+
+    async def get_info(self) -> Dict:
+        """Obtiene información del modelo"""
+        response = await self.session.get("/info")
         return response.json()
 
 
@@ -105,3 +194,16 @@ if __name__ == "__main__":
     resultado_lote = client.predict_batch(datos)
     print(f"   Total procesado: {resultado_lote['total']}")
     print(f"   Resumen: {resultado_lote['summary']}")
+
+    client.close()
+
+    # Predicciones concurrentes con el cliente asíncrono
+    print("\n⚡ Ejemplo de predicciones concurrentes:")
+
+    async def predecir_concurrente(registros: List[Dict]) -> List[Dict]:
+        async with AsyncClusteringAPIClient() as async_client:
+            return await asyncio.gather(*(async_client.predict(**r) for r in registros))
+
+    resultados = asyncio.run(predecir_concurrente(datos))
+    for r in resultados:
+        print(f"   Cluster: {r['cluster_name']}")
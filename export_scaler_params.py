@@ -1,21 +1,27 @@
 """
-Script para exportar parámetros del StandardScaler a JSON
+Script para exportar parámetros del StandardScaler (y centroides del KMeans) a JSON
 Esto elimina la necesidad de scikit-learn en producción
 """
 import joblib
 import json
 import numpy as np
 
-# Cargar scaler
+# Cargar scaler y kmeans
 scaler = joblib.load('models/scaler.pkl')
+kmeans = joblib.load('models/kmeans.pkl')
 
 # Extraer parámetros
 scaler_params = {
     'mean': scaler.mean_.tolist(),
     'scale': scaler.scale_.tolist(),
     'var': scaler.var_.tolist(),
+    # Constantes fusionadas: x_scaled = x * inv_scale + bias
+    'inv_scale': (1.0 / scaler.scale_).tolist(),
+    'bias': (-scaler.mean_ / scaler.scale_).tolist(),
     'n_features_in': int(scaler.n_features_in_),
-    'feature_names': scaler.feature_names_in_.tolist() if hasattr(scaler, 'feature_names_in_') else None
+    'feature_names': scaler.feature_names_in_.tolist() if hasattr(scaler, 'feature_names_in_') else None,
+    # Centroides en el espacio escalado: permiten asignar clusters con numpy, sin onnxruntime
+    'cluster_centers': kmeans.cluster_centers_.tolist()
 }
 
 # Guardar como JSON
@@ -26,6 +32,27 @@ print("✅ Parámetros del scaler exportados a models/scaler_params.json")
 print(f"   - mean: {len(scaler_params['mean'])} valores")
 print(f"   - scale: {len(scaler_params['scale'])} valores")
 print(f"   - features: {scaler_params['n_features_in']}")
+print(f"   - cluster_centers: {len(scaler_params['cluster_centers'])} centroides")
+
+# Artefactos numéricos para main.py (carga con np.load, sin pickle ni scikit-learn)
+np.savez(
+    'models/artifacts.npz',
+    mean=scaler.mean_.astype(np.float64),
+    scale=scaler.scale_.astype(np.float64),
+    cluster_centers=kmeans.cluster_centers_.astype(np.float64),
+    n_clusters=np.int64(kmeans.n_clusters),
+    n_iter=np.int64(kmeans.n_iter_),
+    inertia=np.float64(kmeans.inertia_)
+)
+print("✅ Scaler + centroides exportados a models/artifacts.npz")
+
+# mean/scale en float32 como .npy: main_onnx.py los abre con np.load(mmap_mode='r')
+# cuando los modelos se sirven desde disco (file://), sin pasar por JSON → list → ndarray
+scaler_mean = scaler.mean_.astype(np.float32)
+scaler_scale = scaler.scale_.astype(np.float32)
+np.save('models/scaler_mean.npy', scaler_mean)
+np.save('models/scaler_scale.npy', scaler_scale)
+print("✅ mean/scale exportados a models/scaler_mean.npy y models/scaler_scale.npy")
 
 # Verificar que funciona igual
 print("\n🔍 Verificando que el escalado manual funciona igual...")
@@ -34,11 +61,13 @@ test_data = np.array([[8500, 7200, 6.5, 35.2, 4.1, 0.65, 0.45, 0.38]])
 # Método 1: Con sklearn
 scaled_sklearn = scaler.transform(test_data)
 
-# Método 2: Manual con numpy
-scaled_manual = (test_data - np.array(scaler_params['mean'])) / np.array(scaler_params['scale'])
+# Método 2: Manual con numpy (forma afín fusionada en float32, igual que en main_onnx.py)
+inv_scale = np.float32(1.0) / scaler_scale
+bias = -scaler_mean * inv_scale
+scaled_manual = test_data.astype(np.float32) * inv_scale + bias
 
-# Comparar
-if np.allclose(scaled_sklearn, scaled_manual):
+# Comparar (tolerancia de float32)
+if np.allclose(scaled_sklearn, scaled_manual, rtol=1e-5, atol=1e-5):
     print("✅ El escalado manual es idéntico al de sklearn")
 else:
     print("❌ Hay diferencias en el escalado")
@@ -0,0 +1,76 @@
+/*
+ * Kernel C para asignar el cluster de un registro de 8 características (float32):
+ *   xs = x * inv_scale + bias          (un FMA sobre un registro de 8 floats)
+ *   k  = argmin_k ||xs - centers[k]||²
+ *
+ * En x86-64 con AVX2+FMA usa intrínsecos; si la CPU no los soporta (o en otras
+ * arquitecturas) cae a la versión escalar. Se compila con build_kernel.py (cffi).
+ */
+#include <math.h>
+
+#define N_FEATURES 8
+
+static void assign_scalar(const float* x, const float* inv_scale, const float* bias,
+                          const float* centers, int n_clusters, int* out_k, float* out_d2) {
+    float xs[N_FEATURES];
+    for (int j = 0; j < N_FEATURES; ++j) xs[j] = x[j] * inv_scale[j] + bias[j];
+
+    float best = INFINITY; int bk = 0;
+    for (int k = 0; k < n_clusters; ++k) {
+        float s = 0.0f;
+        for (int j = 0; j < N_FEATURES; ++j) {
+            float d = xs[j] - centers[N_FEATURES * k + j];
+            s += d * d;
+        }
+        if (s < best) { best = s; bk = k; }
+    }
+    *out_k = bk; *out_d2 = best;
+}
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+
+__attribute__((target("avx2,fma")))
+static inline float hsum256(__m256 v) {
+    __m128 lo = _mm_add_ps(_mm256_castps256_ps128(v), _mm256_extractf128_ps(v, 1));
+    __m128 shuf = _mm_movehdup_ps(lo);
+    __m128 sums = _mm_add_ps(lo, shuf);
+    shuf = _mm_movehl_ps(shuf, sums);
+    sums = _mm_add_ss(sums, shuf);
+    return _mm_cvtss_f32(sums);
+}
+
+__attribute__((target("avx2,fma")))
+static void assign_avx2(const float* x, const float* inv_scale, const float* bias,
+                        const float* centers, int n_clusters, int* out_k, float* out_d2) {
+    __m256 xs = _mm256_fmadd_ps(_mm256_loadu_ps(x), _mm256_loadu_ps(inv_scale), _mm256_loadu_ps(bias));
+    float best = INFINITY; int bk = 0;
+    for (int k = 0; k < n_clusters; ++k) {
+        __m256 d = _mm256_sub_ps(xs, _mm256_loadu_ps(centers + N_FEATURES * k));
+        float s = hsum256(_mm256_mul_ps(d, d));
+        if (s < best) { best = s; bk = k; }
+    }
+    *out_k = bk; *out_d2 = best;
+}
+#endif
+
+int has_avx2(void) {
+#if defined(__x86_64__) || defined(__i386__)
+    return __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma");
+#else
+    return 0;
+#endif
+}
+
+void assign(const float* x, const float* inv_scale, const float* bias,
+            const float* centers, int n_clusters, int* out_k, float* out_d2) {
+#if defined(__x86_64__) || defined(__i386__)
+    static int use_avx2 = -1;
+    if (use_avx2 < 0) use_avx2 = has_avx2();
+    if (use_avx2) {
+        assign_avx2(x, inv_scale, bias, centers, n_clusters, out_k, out_d2);
+        return;
+    }
+#endif
+    assign_scalar(x, inv_scale, bias, centers, n_clusters, out_k, out_d2);
+}
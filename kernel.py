@@ -0,0 +1,79 @@
+"""
+Kernel de asignación de cluster para un registro (escalado + centroide más cercano)
+Compilado con Numba si está instalado; si no, usa una versión vectorizada con numpy.
+Para float32 con 8 características existe además un kernel C/AVX2 (kernel.c, ver build_kernel.py)
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba es opcional (no cabe en el límite de tamaño de Vercel)
+    NUMBA_AVAILABLE = False
+
+try:
+    from _kernel_c import ffi as _ffi, lib as _lib
+    C_KERNEL_AVAILABLE = True
+except ImportError:  # Extensión opcional: se compila con `python build_kernel.py`
+    C_KERNEL_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def assign(x, inv_scale, bias, centers):
+        """
+        Escala `x` (x * inv_scale + bias) y devuelve (cluster, distancia²) al centroide más cercano.
+        Todos los argumentos son arrays 1-D de 8 valores salvo `centers` (k, 8).
+        """
+        n_features = x.shape[0]
+        xs = x * inv_scale + bias
+        best_k, best_d2 = 0, 1e30
+        for k in range(centers.shape[0]):
+            d2 = 0.0
+            for j in range(n_features):
+                diff = xs[j] - centers[k, j]
+                d2 += diff * diff
+            if d2 < best_d2:
+                best_d2, best_k = d2, k
+        return best_k, best_d2
+else:
+    def assign(x, inv_scale, bias, centers):
+        """
+        Escala `x` (x * inv_scale + bias) y devuelve (cluster, distancia²) al centroide más cercano.
+        Todos los argumentos son arrays 1-D de 8 valores salvo `centers` (k, 8).
+        """
+        xs = x * inv_scale + bias
+        d2 = ((centers - xs) ** 2).sum(axis=1)
+        best_k = int(d2.argmin())
+        return best_k, float(d2[best_k])
+
+
+def warmup(inv_scale, bias, centers):
+    """Compila (o carga de caché) la especialización para estos dtypes antes del primer request"""
+    assign(np.zeros(inv_scale.shape[0], dtype=inv_scale.dtype), inv_scale, bias, centers)
+
+
+def bind_c_kernel(x, inv_scale, bias, centers):
+    """
+    Enlaza el kernel C a buffers float32 fijos (x, inv_scale y bias de 8 valores,
+    centers (k, 8)) y devuelve una función sin argumentos que asigna el cluster del
+    contenido actual de `x`: los punteros se resuelven una sola vez, no por request.
+    """
+    arrays = (x, inv_scale, bias, centers)
+    if any(a.dtype != np.float32 or not a.flags.c_contiguous for a in arrays):
+        raise ValueError("El kernel C requiere arrays float32 contiguos")
+    if x.shape != (8,) or inv_scale.shape != (8,) or bias.shape != (8,) or centers.shape[1:] != (8,):
+        raise ValueError("El kernel C requiere exactamente 8 características")
+
+    px, pinv, pbias, pcenters = (_ffi.from_buffer("float[]", a) for a in arrays)
+    n_clusters = centers.shape[0]
+    out_k = _ffi.new("int *")
+    out_d2 = _ffi.new("float *")
+
+    def assign_bound():
+        _lib.assign(px, pinv, pbias, pcenters, n_clusters, out_k, out_d2)
+        return out_k[0], out_d2[0]
+
+    # Mantener vivos los arrays mientras exista la función enlazada
+    assign_bound.arrays = arrays
+    return assign_bound
@@ -2,40 +2,77 @@
 """
 FastAPI Server - Clustering Model para Datos Socioeconómicos Honduras
 """
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import joblib
+from fastapi import Body, FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict, Field
 import numpy as np
-import pandas as pd
 from typing import List, Dict
+from itertools import chain
+from functools import lru_cache
 import os
 
+from api_common import (
+    ORJSONRoute, INFO_CACHE_CONTROL, cached_json, prebuilt_json,
+    build_predict_one, cache_key, cache_metrics, check_number
+)
+from kernel import assign, warmup, NUMBA_AVAILABLE
+
 app = FastAPI(
     title="🗺️ Honduras Socioeconomic Clustering API",
     description="API para clasificar departamentos hondureños en clusters de desarrollo",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
+app.router.route_class = ORJSONRoute  # cuerpos JSON decodificados con orjson
+
+# Configuración de CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
 )
 
-# Cargar modelo y scaler al iniciar
-MODEL_PATH = "models/clustering_pipeline.pkl"
-SCALER_PATH = "models/scaler.pkl"
-KMEANS_PATH = "models/kmeans.pkl"
+# Compresión de respuestas grandes (p. ej. /predict-batch con 100 registros).
+# Nivel 1: la mayor parte del ahorro en bytes con el mínimo costo de CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
+# Cargar modelo y scaler al iniciar (arrays exportados por export_scaler_params.py;
+# sin pickle ni scikit-learn en runtime)
+ARTIFACTS_PATH = "models/artifacts.npz"
 FEATURES_PATH = "models/feature_names.txt"
 
 # Validar que los archivos existen
-if not all(os.path.exists(p) for p in [SCALER_PATH, KMEANS_PATH, FEATURES_PATH]):
-    raise FileNotFoundError("❌ Modelos no encontrados. Ejecuta la celda anterior primero.")
+if not all(os.path.exists(p) for p in [ARTIFACTS_PATH, FEATURES_PATH]):
+    raise FileNotFoundError("❌ Modelos no encontrados. Ejecuta export_scaler_params.py primero.")
 
 # Cargar modelos
-scaler = joblib.load(SCALER_PATH)
-kmeans = joblib.load(KMEANS_PATH)
+with np.load(ARTIFACTS_PATH) as arts:
+    MEAN = arts['mean']
+    SCALE = arts['scale']
+    CENTERS = np.ascontiguousarray(arts['cluster_centers'])
+    N_CLUSTERS = int(arts['n_clusters'])
+    N_ITER = int(arts['n_iter'])
+    INERTIA = float(arts['inertia'])
+CENTER_NORM_SQ = (CENTERS ** 2).sum(axis=1)
 
 # Cargar nombres de características
 with open(FEATURES_PATH, 'r') as f:
     feature_names = f.read().strip().split(',')
 
-print(f"✅ Modelo cargado con {kmeans.n_clusters} clusters")
+# Forma afín del escalado para el kernel de /predict: (x - mean) / scale == x * inv_scale + bias
+INV_SCALE = 1.0 / SCALE
+BIAS = -MEAN * INV_SCALE
+warmup(INV_SCALE, BIAS, CENTERS)
+
+print(f"✅ Modelo cargado con {N_CLUSTERS} clusters")
 print(f"✅ Características esperadas: {feature_names}")
+print(f"✅ Kernel de asignación: {'Numba' if NUMBA_AVAILABLE else 'numpy'}")
+print("⚡ Endpoints async (cómputo en RAM, sin I/O bloqueante). Producción: "
+      "uvicorn main:app --loop uvloop --http httptools --workers ${WEB_CONCURRENCY:-1}")
 
 # ═══════════════════════════════════════════════════════════════════════
 # MODELOS DE DATOS (Schemas)
@@ -43,17 +80,10 @@ print(f"✅ Características esperadas: {feature_names}")
 
 class DepartmentData(BaseModel):
     """Datos de un departamento para clasificación"""
-    ymophg_mean: float
-    ymophg_median: float
-    anosest_mean: float
-    edad_mean: float
-    totper_mean: float
-    tasa_ocupacion: float
-    tasa_pobreza: float
-    tasa_nbi: float
-
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra='ignore',
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "ymophg_mean": 8500.5,
                 "ymophg_median": 7200.0,
@@ -65,6 +95,20 @@ class DepartmentData(BaseModel):
                 "tasa_nbi": 0.38
             }
         }
+    )
+
+    # strict: sin coerción (p. ej. strings numéricos); se aceptan int y float
+    ymophg_mean: float = Field(strict=True)
+    ymophg_median: float = Field(strict=True)
+    anosest_mean: float = Field(strict=True)
+    edad_mean: float = Field(strict=True)
+    totper_mean: float = Field(strict=True)
+    tasa_ocupacion: float = Field(strict=True)
+    tasa_pobreza: float = Field(strict=True)
+    tasa_nbi: float = Field(strict=True)
+
+# Orden de las características esperado por el modelo
+_FIELDS = tuple(DepartmentData.model_fields)
 
 class ClusterResponse(BaseModel):
     """Respuesta con asignación de cluster"""
@@ -79,28 +123,71 @@ class BatchResponse(BaseModel):
     clusters: List[Dict]
     summary: Dict[str, int]
 
+# ═══════════════════════════════════════════════════════════════════════
+# RESPUESTAS CONSTANTES (se arman una sola vez al iniciar)
+# ═══════════════════════════════════════════════════════════════════════
+
+# Indexadas por número de cluster (los nombres vienen de api_common.CLUSTER_NAMES)
+CLUSTER_DESCRIPTIONS = (
+    "Departamento con indicadores socioeconómicos altos",
+    "Departamento con indicadores socioeconómicos medio-altos",
+    "Departamento con indicadores socioeconómicos medio-bajos",
+    "Departamento con indicadores socioeconómicos bajos"
+)
+
+_HOME_RESPONSE = {
+    "mensaje": "🗺️ API de Clustering Socioeconómico de Honduras",
+    "versión": "1.0.0",
+    "modelo": "KMeans (4 clusters)",
+    "características": len(feature_names),
+    "documentación": "/docs"
+}
+
+_INFO_RESPONSE = {
+    "modelo": "KMeans Clustering",
+    "n_clusters": N_CLUSTERS,
+    "features": feature_names,
+    "n_features": len(feature_names),
+    "iter": N_ITER,
+    "inertia": INERTIA
+}
+
+_HEALTH_RESPONSE = {"status": "healthy", "ready": True}
+
+# Bytes JSON ya serializados + ETag para los endpoints idempotentes (/, /health, /info)
+HOME_BYTES, HOME_ETAG = prebuilt_json(_HOME_RESPONSE)
+HEALTH_BYTES, HEALTH_ETAG = prebuilt_json(_HEALTH_RESPONSE)
+INFO_BYTES, INFO_ETAG = prebuilt_json(_INFO_RESPONSE)
+
 # ═══════════════════════════════════════════════════════════════════════
 # ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════════
 
 @app.get("/")
-def home():
+async def home(request: Request):
     """Endpoint raíz - información de la API"""
-    return {
-        "mensaje": "🗺️ API de Clustering Socioeconómico de Honduras",
-        "versión": "1.0.0",
-        "modelo": "KMeans (4 clusters)",
-        "características": len(feature_names),
-        "documentación": "/docs"
-    }
+    return cached_json(request, HOME_BYTES, HOME_ETAG)
 
 @app.get("/health")
-def health_check():
+async def health_check(request: Request):
     """Health check del servidor"""
-    return {"status": "healthy", "ready": True}
+    return cached_json(request, HEALTH_BYTES, HEALTH_ETAG)
+
+@lru_cache(maxsize=4096)
+def _assign_cached(key: tuple) -> tuple:
+    """
+    (cluster, {"confidence": ...}) de un registro sin escalar, con las 8 características
+    redondeadas a 4 decimales. Memoizado por worker: los dashboards repiten el mismo payload.
+    """
+    # Escalar + centroide más cercano en un solo kernel compilado
+    cluster, d2 = assign(np.array(key, dtype=np.float64), INV_SCALE, BIAS, CENTERS)
+    distance = float(d2) ** 0.5
+    return int(cluster), {"confidence": 1 / (1 + distance)}  # Convertir a confianza (0-1)
+
+_predict_one = build_predict_one(_assign_cached, ClusterResponse, CLUSTER_DESCRIPTIONS)
 
 @app.post("/predict", response_model=ClusterResponse)
-def predict_cluster(data: DepartmentData):
+async def predict_cluster(data: DepartmentData):
     """
     Predice el cluster de desarrollo para datos departamentales.
 
@@ -120,7 +207,7 @@ def predict_cluster(data: DepartmentData):
     """
     try:
         # Preparar datos en el orden correcto
-        X_input = np.array([[
+        key = cache_key((
             data.ymophg_mean,
             data.ymophg_median,
             data.anosest_mean,
@@ -129,47 +216,51 @@ def predict_cluster(data: DepartmentData):
             data.tasa_ocupacion,
             data.tasa_pobreza,
             data.tasa_nbi
-        ]])
-
-        # Escalar (convertir a DataFrame para preservar nombres de características)
-        X_df = pd.DataFrame(X_input, columns=feature_names)
-        X_scaled = scaler.transform(X_df)
-
-        # Predecir cluster
-        cluster = int(kmeans.predict(X_scaled)[0])
-
-        # Calcular distancia al centroide (confianza)
-        distances = np.linalg.norm(X_scaled - kmeans.cluster_centers_, axis=1)
-        distance = float(distances[0])
-        confidence = 1 / (1 + distance)  # Convertir a confianza (0-1)
-
-        # Nombres de clusters
-        cluster_names = {
-            0: "Desarrollo Alto 🟢",
-            1: "Desarrollo Medio-Alto 🔵",
-            2: "Desarrollo Medio-Bajo 🟠",
-            3: "Desarrollo Bajo 🔴"
-        }
+        ))
 
-        descriptions = {
-            0: "Departamento con indicadores socioeconómicos altos",
-            1: "Departamento con indicadores socioeconómicos medio-altos",
-            2: "Departamento con indicadores socioeconómicos medio-bajos",
-            3: "Departamento con indicadores socioeconómicos bajos"
-        }
+        return _predict_one(key)
 
-        return ClusterResponse(
-            cluster=cluster,
-            cluster_name=cluster_names[cluster],
-            confidence=confidence,
-            description=descriptions[cluster]
-        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error en predicción: {str(e)}")
+
+@app.post("/predict-raw", response_model=ClusterResponse)
+async def predict_cluster_raw(data: dict = Body(...)):
+    """
+    Igual que /predict pero sin validación pydantic: lee las 8 características
+    directamente del JSON (mismas claves que /predict).
+    """
+    try:
+        key = cache_key(data[f] for f in _FIELDS)
+        return _predict_one(key)
 
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Error en predicción: falta el campo {e}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error en predicción: {str(e)}")
 
+def _predict_rows(X_input: np.ndarray) -> BatchResponse:
+    """Asigna clusters a una matriz (n, 8) de características sin escalar"""
+    # Escalar directamente con numpy (mismo cálculo que scaler.transform)
+    X_scaled = (X_input - MEAN) / SCALE
+
+    # Predecir clusters (centroide más cercano, misma identidad que en /predict)
+    d2 = (X_scaled ** 2).sum(axis=1, keepdims=True) + CENTER_NORM_SQ - 2 * (X_scaled @ CENTERS.T)
+    clusters = d2.argmin(axis=1)
+
+    # Preparar respuesta (conteo por cluster con bincount, sin bucle Python)
+    clusters_list = clusters.tolist()
+    results = [{"index": i, "cluster": c} for i, c in enumerate(clusters_list)]
+    counts = np.bincount(clusters, minlength=4).tolist()
+    cluster_count = {str(k): n for k, n in enumerate(counts)}
+
+    return BatchResponse(
+        total=X_input.shape[0],
+        clusters=results,
+        summary=cluster_count
+    )
+
 @app.post("/predict-batch", response_model=BatchResponse)
-def predict_batch(data_list: List[DepartmentData]):
+async def predict_batch(data_list: List[DepartmentData]):
     """
     Predice clusters para múltiples departamentos en lote.
     """
@@ -183,41 +274,43 @@ def predict_batch(data_list: List[DepartmentData]):
             d.totper_mean, d.tasa_ocupacion, d.tasa_pobreza, d.tasa_nbi
         ] for d in data_list])
 
-        # Escalar (convertir a DataFrame para preservar nombres de características)
-        X_df = pd.DataFrame(X_input, columns=feature_names)
-        X_scaled = scaler.transform(X_df)
+        return _predict_rows(X_input)
 
-        # Predecir clusters
-        clusters = kmeans.predict(X_scaled)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error en predicción por lote: {str(e)}")
 
-        # Preparar respuesta
-        results = []
-        cluster_count = {0: 0, 1: 0, 2: 0, 3: 0}
+@app.post("/predict-batch-fast", response_model=BatchResponse)
+async def predict_batch_fast(payload: List[dict] = Body(...)):
+    """
+    Igual que /predict-batch pero sin validar cada registro con pydantic (clientes de
+    confianza): solo se valida el tamaño del lote y se leen las 8 claves de cada dict.
+    """
+    if not payload or len(payload) > 100:
+        raise HTTPException(status_code=400, detail="Proporcionar entre 1 y 100 registros")
 
-        for i, cluster in enumerate(clusters):
-            cluster = int(cluster)
-            cluster_count[cluster] += 1
-            results.append({"index": i, "cluster": cluster})
+    try:
+        n_rows = len(payload)
+        X_input = np.fromiter(
+            chain.from_iterable((check_number(d[f]) for f in _FIELDS) for d in payload),
+            dtype=np.float64, count=n_rows * 8
+        ).reshape(n_rows, 8)
 
-        return BatchResponse(
-            total=len(data_list),
-            clusters=results,
-            summary=cluster_count
-        )
+        return _predict_rows(X_input)
 
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Error en predicción por lote: falta el campo {e}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error en predicción por lote: {str(e)}")
 
 @app.get("/info")
-def model_info():
+async def model_info(request: Request):
     """Información del modelo"""
-    return {
-        "modelo": "KMeans Clustering",
-        "n_clusters": kmeans.n_clusters,
-        "features": feature_names,
-        "n_features": len(feature_names),
-        "iter": kmeans.n_iter_,
-        "inertia": float(kmeans.inertia_)
-    }
-
-# Para ejecutar: uvicorn app:app --reload
+    return cached_json(request, INFO_BYTES, INFO_ETAG, INFO_CACHE_CONTROL)
+
+@app.get("/metrics")
+async def metrics():
+    """Estadísticas del caché de predicciones de /predict y /predict-raw (por worker)"""
+    return cache_metrics(_assign_cached)
+
+# Para ejecutar: uvicorn main:app --reload
+# Producción: uvicorn main:app --loop uvloop --http httptools --workers ${WEB_CONCURRENCY:-1}
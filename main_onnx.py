@@ -1,16 +1,29 @@
 """
 FastAPI Server - Clustering Model ONNX (Versión Ligera)
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict, Field
 import onnxruntime as rt
 import numpy as np
 from typing import List, Dict
 import os
 import dotenv
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import json
+import tempfile
+from itertools import chain
+from functools import lru_cache
+
+from api_common import (
+    ORJSONRoute, INFO_CACHE_CONTROL, cached_json, prebuilt_json,
+    build_predict_one, cache_key, cache_metrics, check_number
+)
+from kernel import assign, warmup, bind_c_kernel, NUMBA_AVAILABLE, C_KERNEL_AVAILABLE
 
 #Cargar variables de entorno
 dotenv.load_dotenv()
@@ -18,8 +31,10 @@ dotenv.load_dotenv()
 app = FastAPI(
     title="🗺️ Honduras Clustering API (ONNX)",
     description="API ligera para clasificar departamentos - Solo 50MB",
-    version="2.0.0 - ONNX + Vercel Blob"
+    version="2.0.0 - ONNX + Vercel Blob",
+    default_response_class=ORJSONResponse
 )
+app.router.route_class = ORJSONRoute  # cuerpos JSON decodificados con orjson
 
 # Configuración de CORS
 app.add_middleware(
@@ -30,18 +45,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresión de respuestas grandes (p. ej. /predict-batch con 100 registros).
+# Nivel 1: la mayor parte del ahorro en bytes con el mínimo costo de CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=1)
+
 # ═══════════════════════════════════════════════════════════════════════
 # CARGAR MODELOS DIRECTAMENTE DESDE VERCEL BLOB (EN RAM)
 # ═══════════════════════════════════════════════════════════════════════
 
-def load_from_url(url: str, description: str = "archivo"):
-    """Carga un archivo directamente desde URL a memoria"""
+# Sesión compartida con keep-alive para las descargas del blob
+BLOB_CACHE_DIR = os.getenv("BLOB_CACHE_DIR", "/tmp")
+try:
+    os.makedirs(BLOB_CACHE_DIR, exist_ok=True)
+except OSError as e:
+    # La caché es opcional: sin directorio se descarga siempre (y file:// no la usa)
+    print(f"⚠️ No se pudo crear BLOB_CACHE_DIR={BLOB_CACHE_DIR}: {e}")
+_blob_session = requests.Session()
+_blob_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+_blob_session.mount("https://", _blob_adapter)
+_blob_session.mount("http://", _blob_adapter)
+
+def _atomic_write(path: str, data: bytes):
+    """
+    Escribe `data` en un temporal de BLOB_CACHE_DIR y lo renombra sobre `path`:
+    los workers que leen la caché en paralelo (o tras un crash) nunca ven un archivo a medias.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=BLOB_CACHE_DIR, prefix=".blob-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def load_from_url(url: str, description: str = "archivo", cache_name: str = None):
+    """
+    Carga un archivo desde URL a memoria.
+
+    Si se indica `cache_name`, guarda una copia en BLOB_CACHE_DIR junto con su ETag;
+    en arranques posteriores (warm start) se hace un GET condicional y, si el blob
+    no cambió (304), se reutiliza la copia local sin volver a descargarla.
+    """
+    if url.startswith("file://"):
+        # Modelos servidos desde disco (desarrollo local / imagen Docker): lectura directa
+        with open(url[len("file://"):], 'rb') as f:
+            content = f.read()
+        print(f"✅ {description} cargado desde disco ({len(content)} bytes)")
+        return content
+
+    cache_path = os.path.join(BLOB_CACHE_DIR, cache_name) if cache_name else None
+    etag_path = f"{cache_path}.etag" if cache_path else None
     try:
+        headers = {}
+        if cache_path and os.path.exists(cache_path) and os.path.exists(etag_path):
+            with open(etag_path, 'r') as f:
+                headers["If-None-Match"] = f.read().strip()
+
         print(f"📥 Cargando {description} desde blob...")
-        response = requests.get(url, timeout=30)
+        response = _blob_session.get(url, headers=headers, timeout=(5, 30))
+
+        if response.status_code == 304:
+            with open(cache_path, 'rb') as f:
+                content = f.read()
+            print(f"✅ {description} sin cambios, cargado desde caché local ({len(content)} bytes)")
+            return content
+
         response.raise_for_status()
-        print(f"✅ {description} cargado en RAM ({len(response.content)} bytes)")
-        return response.content
+        content = response.content
+        etag = response.headers.get("ETag")
+        if cache_path and etag:
+            try:
+                # Primero el cuerpo y después el ETag: un ETag nunca acompaña a un cuerpo viejo o truncado
+                _atomic_write(cache_path, content)
+                _atomic_write(etag_path, etag.encode('utf-8'))
+            except OSError as e:
+                print(f"⚠️ No se pudo guardar {description} en caché: {e}")
+        print(f"✅ {description} cargado en RAM ({len(content)} bytes)")
+        return content
     except Exception as e:
         raise Exception(f"❌ Error cargando {description} desde {url}: {str(e)}")
 
@@ -55,25 +139,90 @@ if not all([MODEL_BLOB_URL, SCALER_PARAMS_BLOB_URL, FEATURE_NAMES_BLOB_URL]):
 
 print("🔄 Cargando modelos desde Vercel Blob Storage...")
 
+# Descargar los tres archivos en paralelo (el arranque tarda lo que la descarga más lenta)
+with ThreadPoolExecutor(max_workers=3) as pool:
+    model_future = pool.submit(load_from_url, MODEL_BLOB_URL, "Modelo ONNX", "model.onnx")
+    scaler_params_future = pool.submit(load_from_url, SCALER_PARAMS_BLOB_URL, "Scaler Params", "scaler_params.json")
+    features_future = pool.submit(load_from_url, FEATURE_NAMES_BLOB_URL, "Feature Names", "feature_names.txt")
+    model_bytes = model_future.result()
+    scaler_params_bytes = scaler_params_future.result()
+    features_bytes = features_future.result()
+
 # Cargar modelo ONNX directamente en RAM
-model_bytes = load_from_url(MODEL_BLOB_URL, "Modelo ONNX")
 sess = rt.InferenceSession(model_bytes, providers=['CPUExecutionProvider'])
 input_name = sess.get_inputs()[0].name
 output_name = sess.get_outputs()[0].name
 
+# Buffers preasignados + io_binding para /predict (1 fila): onnxruntime lee y escribe
+# directamente sobre estos arrays, sin crear OrtValues ni copiar entrada/salida por request.
+# Los endpoints son async y no ceden el event loop entre llenar el buffer y leer la
+# salida, así que compartirlos dentro de un worker es seguro.
+# El grafo ONNX es el Pipeline completo (nodo Scaler + KMeans): recibe las
+# características SIN escalar.
+X_BUF = np.empty((1, 8), dtype=np.float32)
+OUT_BUF = np.empty((1,), dtype=np.int64)
+io_binding = sess.io_binding()
+io_binding.bind_input(input_name, 'cpu', 0, np.float32, X_BUF.shape, X_BUF.ctypes.data)
+io_binding.bind_output(output_name, 'cpu', 0, np.int64, OUT_BUF.shape, OUT_BUF.ctypes.data)
+
 # Cargar parámetros del scaler (JSON, sin necesidad de sklearn)
-scaler_params_bytes = load_from_url(SCALER_PARAMS_BLOB_URL, "Scaler Params")
 scaler_params = json.loads(scaler_params_bytes.decode('utf-8'))
-scaler_mean = np.array(scaler_params['mean'])
-scaler_scale = np.array(scaler_params['scale'])
+# float32 desde el inicio: mismo dtype que la entrada del modelo ONNX, sin upcast a float64.
+# Con file:// se usan los .npy exportados junto al JSON (mmap, sin convertir listas);
+# desde Vercel Blob se castea el JSON una sola vez.
+scaler_mean = scaler_scale = None
+_scaler_dir = os.path.dirname(SCALER_PARAMS_BLOB_URL[len("file://"):]) if SCALER_PARAMS_BLOB_URL.startswith("file://") else None
+if _scaler_dir and all(os.path.exists(os.path.join(_scaler_dir, f)) for f in ("scaler_mean.npy", "scaler_scale.npy")):
+    scaler_mean = np.load(os.path.join(_scaler_dir, "scaler_mean.npy"), mmap_mode='r')
+    scaler_scale = np.load(os.path.join(_scaler_dir, "scaler_scale.npy"), mmap_mode='r')
+    # Los centroides salen del JSON: si los .npy no corresponden a ese JSON
+    # (p. ej. se regeneró solo uno de los dos), se usa el JSON para todo
+    n_json = len(scaler_params['mean'])
+    if not (scaler_mean.shape == scaler_scale.shape == (n_json,)
+            and np.allclose(scaler_mean, scaler_params['mean'])
+            and np.allclose(scaler_scale, scaler_params['scale'])):
+        print("⚠️ scaler_mean.npy/scaler_scale.npy no coinciden con scaler_params.json; se usa el JSON")
+        scaler_mean = scaler_scale = None
+if scaler_mean is None:
+    scaler_mean = np.asarray(scaler_params['mean'], dtype=np.float32)
+    scaler_scale = np.asarray(scaler_params['scale'], dtype=np.float32)
+
+# Normalización fusionada en forma afín: (x - mean) / scale == x * inv_scale + bias
+_INV_SCALE = (np.float32(1.0) / scaler_scale).reshape(1, -1)
+_BIAS = (-scaler_mean * _INV_SCALE[0]).reshape(1, -1)
+
+# Centroides del KMeans (espacio escalado) para asignar clusters con una sola gemm,
+# sin pasar por onnxruntime. USE_ONNX_HEAD=1 fuerza el uso del modelo ONNX.
+USE_ONNX_HEAD = os.getenv("USE_ONNX_HEAD", "0") == "1" or 'cluster_centers' not in scaler_params
+if not USE_ONNX_HEAD:
+    CENTERS = np.asarray(scaler_params['cluster_centers'], dtype=np.float32)
+    CN2 = (CENTERS ** 2).sum(axis=1)
+    warmup(_INV_SCALE[0], _BIAS[0], CENTERS)
+
+# Kernel C/AVX2 enlazado una vez al buffer de /predict (si la extensión está compilada)
+_assign_c = None
+if not USE_ONNX_HEAD and C_KERNEL_AVAILABLE:
+    _assign_c = bind_c_kernel(X_BUF[0], _INV_SCALE[0], _BIAS[0], CENTERS)
+
+# Buffers de trabajo para /predict-batch, dimensionados para el lote máximo:
+# sin asignaciones para la normalización ni las distancias después del arranque
+MAX_BATCH = 100
+if not USE_ONNX_HEAD:
+    _SCRATCH = np.empty((MAX_BATCH, 8), dtype=np.float32)
+    _DIST = np.empty((MAX_BATCH, CENTERS.shape[0]), dtype=np.float32)
 
 # Cargar feature names directamente en RAM
-features_bytes = load_from_url(FEATURE_NAMES_BLOB_URL, "Feature Names")
 feature_names = features_bytes.decode('utf-8').strip().split(',')
 
 print(f"✅ Modelo ONNX cargado en RAM")
 print(f"✅ Scaler params cargado en RAM (sin sklearn)")
 print(f"✅ Características: {len(feature_names)}")
+if USE_ONNX_HEAD:
+    print("✅ Asignación de clusters: ONNX")
+else:
+    print(f"✅ Asignación de clusters: kernel {'C' if _assign_c else ('Numba' if NUMBA_AVAILABLE else 'numpy')}")
+print("⚡ Endpoints async (cómputo en RAM, sin I/O bloqueante). Producción: "
+      "uvicorn main_onnx:app --loop uvloop --http httptools --workers ${WEB_CONCURRENCY:-1}")
 
 # ═══════════════════════════════════════════════════════════════════════
 # SCHEMAS
@@ -81,14 +230,44 @@ print(f"✅ Características: {len(feature_names)}")
 
 class DepartmentData(BaseModel):
     """Datos de un departamento"""
-    ymophg_mean: float
-    ymophg_median: float
-    anosest_mean: float
-    edad_mean: float
-    totper_mean: float
-    tasa_ocupacion: float
-    tasa_pobreza: float
-    tasa_nbi: float
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    # strict: sin coerción (p. ej. strings numéricos); se aceptan int y float
+    ymophg_mean: float = Field(strict=True)
+    ymophg_median: float = Field(strict=True)
+    anosest_mean: float = Field(strict=True)
+    edad_mean: float = Field(strict=True)
+    totper_mean: float = Field(strict=True)
+    tasa_ocupacion: float = Field(strict=True)
+    tasa_pobreza: float = Field(strict=True)
+    tasa_nbi: float = Field(strict=True)
+
+# Orden de las características esperado por el modelo
+_FIELDS = tuple(DepartmentData.model_fields)
+
+def _build_row_extractor(fields, from_models=True):
+    """
+    Genera al iniciar una función especializada para `fields` que lee cada registro
+    con claves constantes (el __dict__ de cada DepartmentData, o el dict crudo si
+    `from_models` es False) y devuelve un array float32 (n, len(fields)), sin listas
+    intermedias ni getattr por campo.
+    """
+    # Los dicts crudos no pasaron por pydantic: cada valor se valida con check_number
+    value = "dd[{!r}]" if from_models else "check_number(dd[{!r}])"
+    row = ", ".join(value.format(f) for f in fields)
+    records = "(d.__dict__ for d in data_list)" if from_models else "data_list"
+    src = (
+        "def _extract_rows(data_list):\n"
+        "    n_rows = len(data_list)\n"
+        f"    values = chain.from_iterable(({row}) for dd in {records})\n"
+        f"    return np.fromiter(values, dtype=np.float32, count=n_rows * {len(fields)}).reshape(n_rows, {len(fields)})\n"
+    )
+    namespace = {"np": np, "chain": chain, "check_number": check_number}
+    exec(src, namespace)
+    return namespace["_extract_rows"]
+
+_extract_rows = _build_row_extractor(_FIELDS)
+_extract_dict_rows = _build_row_extractor(_FIELDS, from_models=False)
 
 class ClusterResponse(BaseModel):
     """Respuesta con cluster"""
@@ -102,107 +281,170 @@ class BatchResponse(BaseModel):
     clusters: List[Dict]
     summary: Dict[str, int]
 
+# ═══════════════════════════════════════════════════════════════════════
+# RESPUESTAS CONSTANTES (se arman una sola vez al iniciar)
+# ═══════════════════════════════════════════════════════════════════════
+
+# Indexadas por número de cluster (los nombres vienen de api_common.CLUSTER_NAMES)
+CLUSTER_DESCRIPTIONS = (
+    "Indicadores socioeconómicos altos",
+    "Indicadores socioeconómicos medio-altos",
+    "Indicadores socioeconómicos medio-bajos",
+    "Indicadores socioeconómicos bajos"
+)
+
+_HOME_RESPONSE = {
+    "mensaje": "🗺️ API de Clustering Honduras (ONNX Lightweight)",
+    "versión": "2.0.0",
+    "modelo": "ONNX + onnxruntime",
+    "storage": "Vercel Blob (carga directa en RAM)",
+    "tamaño": "~50 MB (95% más ligero)"
+}
+
+_INFO_RESPONSE = {
+    "modelo": "KMeans (ONNX)",
+    "n_clusters": 4,
+    "features": feature_names,
+    "n_features": len(feature_names),
+    "framework": "onnxruntime",
+    "storage": "Vercel Blob (RAM only)",
+    "memoria": "~50 MB"
+}
+
+_HEALTH_RESPONSE = {"status": "healthy", "ready": True}
+
+# Bytes JSON ya serializados + ETag para los endpoints idempotentes (/, /health, /info)
+HOME_BYTES, HOME_ETAG = prebuilt_json(_HOME_RESPONSE)
+HEALTH_BYTES, HEALTH_ETAG = prebuilt_json(_HEALTH_RESPONSE)
+INFO_BYTES, INFO_ETAG = prebuilt_json(_INFO_RESPONSE)
+
 # ═══════════════════════════════════════════════════════════════════════
 # ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════════
 
 @app.get("/")
-def home():
+async def home(request: Request):
     """Información de la API"""
-    return {
-        "mensaje": "🗺️ API de Clustering Honduras (ONNX Lightweight)",
-        "versión": "2.0.0",
-        "modelo": "ONNX + onnxruntime",
-        "storage": "Vercel Blob (carga directa en RAM)",
-        "tamaño": "~50 MB (95% más ligero)"
-    }
+    return cached_json(request, HOME_BYTES, HOME_ETAG)
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy", "ready": True}
+async def health_check(request: Request):
+    return cached_json(request, HEALTH_BYTES, HEALTH_ETAG)
+
+def _assign_from_buffer() -> int:
+    """Asigna el cluster del registro ya cargado (sin escalar) en X_BUF"""
+    if USE_ONNX_HEAD:
+        # Predicción con ONNX (io_binding: la salida queda en OUT_BUF)
+        sess.run_with_iobinding(io_binding)
+        return int(OUT_BUF[0])
+    if _assign_c is not None:
+        # Kernel C: lee X_BUF por puntero, sin conversión de argumentos
+        return _assign_c()[0]
+    # Escalar + centroide más cercano en un solo kernel compilado
+    return int(assign(X_BUF[0], _INV_SCALE[0], _BIAS[0], CENTERS)[0])
+
+@lru_cache(maxsize=4096)
+def _assign_cached(key: tuple) -> tuple:
+    """
+    (cluster, {}) de un registro sin escalar, con las 8 características redondeadas a
+    4 decimales. Memoizado por worker: los dashboards repiten el mismo payload.
+    """
+    X_BUF[0] = key
+    return _assign_from_buffer(), {}
+
+_predict_one = build_predict_one(_assign_cached, ClusterResponse, CLUSTER_DESCRIPTIONS)
 
 @app.post("/predict", response_model=ClusterResponse)
-def predict_cluster(data: DepartmentData):
+async def predict_cluster(data: DepartmentData):
     """Predice el cluster"""
     try:
-        # Preparar datos
-        X_input = np.array([[
+        # Sin escalar: el grafo ONNX aplica el scaler
+        key = cache_key((
             data.ymophg_mean, data.ymophg_median, data.anosest_mean, data.edad_mean,
             data.totper_mean, data.tasa_ocupacion, data.tasa_pobreza, data.tasa_nbi
-        ]], dtype=np.float32)
-
-        # Normalizar manualmente (sin sklearn)
-        X_scaled = ((X_input - scaler_mean) / scaler_scale).astype(np.float32)
-
-        # Predicción con ONNX
-        pred_onnx = sess.run([output_name], {input_name: X_scaled})
-        cluster = int(pred_onnx[0][0])
-
-        cluster_names = {
-            0: "Desarrollo Alto 🟢",
-            1: "Desarrollo Medio-Alto 🔵",
-            2: "Desarrollo Medio-Bajo 🟠",
-            3: "Desarrollo Bajo 🔴"
-        }
-
-        descriptions = {
-            0: "Indicadores socioeconómicos altos",
-            1: "Indicadores socioeconómicos medio-altos",
-            2: "Indicadores socioeconómicos medio-bajos",
-            3: "Indicadores socioeconómicos bajos"
-        }
-
-        return ClusterResponse(
-            cluster=cluster,
-            cluster_name=cluster_names[cluster],
-            description=descriptions[cluster]
-        )
+        ))
+        return _predict_one(key)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
 
+@app.post("/predict-raw", response_model=ClusterResponse)
+async def predict_cluster_raw(data: dict = Body(...)):
+    """Igual que /predict pero sin validación pydantic: lee las 8 claves del JSON directamente"""
+    try:
+        return _predict_one(cache_key(data[f] for f in _FIELDS))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Error: falta el campo {e}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
+
+def _predict_rows(X_input: np.ndarray) -> BatchResponse:
+    """Asigna clusters a una matriz (n, 8) float32 de características sin escalar"""
+    n_rows = X_input.shape[0]
+
+    if USE_ONNX_HEAD:
+        # El grafo ONNX escala internamente: recibe las características crudas
+        pred_onnx = sess.run([output_name], {input_name: X_input})
+        clusters = pred_onnx[0].ravel().astype(np.int64)
+    else:
+        # Normalizar manualmente (sin sklearn) hacia el buffer de trabajo
+        X_scaled = _SCRATCH[:n_rows]
+        np.multiply(X_input, _INV_SCALE, out=X_scaled)
+        np.add(X_scaled, _BIAS, out=X_scaled)
+
+        # Centroide más cercano: ||x - c||² = ||x||² + ||c||² - 2·x·cᵀ (una gemm batch×8·8×4).
+        # ||x||² es constante por fila, así que no cambia el argmin y se omite.
+        scores = _DIST[:n_rows]
+        np.dot(X_scaled, CENTERS.T, out=scores)
+        scores *= -2
+        scores += CN2
+        clusters = scores.argmin(axis=1)
+
+    # Conteo por cluster con bincount, sin bucle Python
+    clusters_list = clusters.tolist()
+    results = [{"index": i, "cluster": c} for i, c in enumerate(clusters_list)]
+    counts = np.bincount(clusters, minlength=4).tolist()
+    cluster_count = {str(k): n for k, n in enumerate(counts)}
+
+    return BatchResponse(
+        total=n_rows,
+        clusters=results,
+        summary=cluster_count
+    )
+
 @app.post("/predict-batch", response_model=BatchResponse)
-def predict_batch(data_list: List[DepartmentData]):
+async def predict_batch(data_list: List[DepartmentData]):
     """Predice para múltiples departamentos"""
-    if not data_list or len(data_list) > 100:
+    if not data_list or len(data_list) > MAX_BATCH:
         raise HTTPException(status_code=400, detail="Entre 1 y 100 registros")
 
     try:
-        X_input = np.array([[
-            d.ymophg_mean, d.ymophg_median, d.anosest_mean, d.edad_mean,
-            d.totper_mean, d.tasa_ocupacion, d.tasa_pobreza, d.tasa_nbi
-        ] for d in data_list], dtype=np.float32)
-
-        # Normalizar manualmente (sin sklearn)
-        X_scaled = ((X_input - scaler_mean) / scaler_scale).astype(np.float32)
-        pred_onnx = sess.run([output_name], {input_name: X_scaled})
-        clusters = pred_onnx[0].flatten().astype(int)
-
-        results = []
-        cluster_count = {0: 0, 1: 0, 2: 0, 3: 0}
-
-        for i, cluster in enumerate(clusters):
-            cluster = int(cluster)
-            cluster_count[cluster] += 1
-            results.append({"index": i, "cluster": cluster})
-
-        return BatchResponse(
-            total=len(data_list),
-            clusters=results,
-            summary=cluster_count
-        )
+        return _predict_rows(_extract_rows(data_list))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
+
+@app.post("/predict-batch-fast", response_model=BatchResponse)
+async def predict_batch_fast(payload: List[dict] = Body(...)):
+    """
+    Igual que /predict-batch pero sin validar cada registro con pydantic (clientes de
+    confianza): solo se valida el tamaño del lote y se leen las 8 claves de cada dict.
+    """
+    if not payload or len(payload) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail="Entre 1 y 100 registros")
+
+    try:
+        return _predict_rows(_extract_dict_rows(payload))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Error: falta el campo {e}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {str(e)}")
 
 @app.get("/info")
-def model_info():
+async def model_info(request: Request):
     """Info del modelo"""
-    return {
-        "modelo": "KMeans (ONNX)",
-        "n_clusters": 4,
-        "features": feature_names,
-        "n_features": len(feature_names),
-        "framework": "onnxruntime",
-        "storage": "Vercel Blob (RAM only)",
-        "memoria": "~50 MB"
-    }
+    return cached_json(request, INFO_BYTES, INFO_ETAG, INFO_CACHE_CONTROL)
+
+@app.get("/metrics")
+async def metrics():
+    """Estadísticas del caché de predicciones de /predict y /predict-raw (por worker)"""
+    return cache_metrics(_assign_cached)
 
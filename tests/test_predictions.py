@@ -0,0 +1,88 @@
+"""
+Regresión: /predict y /predict-batch de ambas apps deben coincidir con
+kmeans.predict(scaler.transform(X)) de los modelos entrenados en models/
+"""
+import importlib.util
+import os
+import sys
+from collections import Counter
+from unittest import mock
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+joblib = pytest.importorskip("joblib")
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS = os.path.join(ROOT, "models")
+FIELDS = ("ymophg_mean", "ymophg_median", "anosest_mean", "edad_mean",
+          "totper_mean", "tasa_ocupacion", "tasa_pobreza", "tasa_nbi")
+
+sys.path.insert(0, ROOT)
+
+
+def _load_app(module_name, alias, **env):
+    """Importa una copia nueva de la app (las apps cargan el modelo al importarse)"""
+    spec = importlib.util.spec_from_file_location(alias, os.path.join(ROOT, f"{module_name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        with mock.patch.dict(os.environ, env):
+            spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+    return module.app
+
+
+def _onnx_env(use_onnx_head):
+    pytest.importorskip("onnxruntime")
+    return {
+        "MODEL_BLOB_URL": f"file://{MODELS}/clustering_model.onnx",
+        "SCALER_PARAMS_BLOB_URL": f"file://{MODELS}/scaler_params.json",
+        "FEATURE_NAMES_BLOB_URL": f"file://{MODELS}/feature_names.txt",
+        "USE_ONNX_HEAD": use_onnx_head,
+    }
+
+
+@pytest.fixture(scope="module", params=["main", "main_onnx", "main_onnx_head"])
+def client(request):
+    if request.param == "main":
+        app = _load_app("main", "main_under_test")
+    elif request.param == "main_onnx":
+        app = _load_app("main_onnx", "main_onnx_under_test", **_onnx_env("0"))
+    else:
+        app = _load_app("main_onnx", "main_onnx_head_under_test", **_onnx_env("1"))
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def records():
+    """100 registros aleatorios alrededor de la media y los clusters esperados según sklearn"""
+    scaler = joblib.load(os.path.join(MODELS, "scaler.pkl"))
+    kmeans = joblib.load(os.path.join(MODELS, "kmeans.pkl"))
+    rng = np.random.default_rng(0)
+    X = scaler.mean_ + rng.standard_normal((100, 8)) * scaler.scale_ * 1.5
+    expected = kmeans.predict(scaler.transform(X)).tolist()
+    return [dict(zip(FIELDS, map(float, row))) for row in X], expected
+
+
+def test_predict_matches_sklearn(client, records):
+    data, expected = records
+    got = [client.post("/predict", json=record).json()["cluster"] for record in data[:20]]
+    assert got == expected[:20]
+
+
+def test_predict_batch_matches_sklearn(client, records):
+    data, expected = records
+    response = client.post("/predict-batch", json=data)
+    assert response.status_code == 200, response.text
+
+    body = response.json()
+    assert body["total"] == len(data)
+    assert [c["cluster"] for c in body["clusters"]] == expected
+    # Claves del resumen como strings (Dict[str, int])
+    counts = Counter(expected)
+    assert body["summary"] == {str(k): counts.get(k, 0) for k in range(4)}